@@ -6,9 +6,12 @@ This script measures the performance improvements from various optimization
 strategies applied to Tagflow.
 """
 
-import time
+import argparse
+import gc
+import timeit
 import statistics
-from typing import List, Dict, Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Callable, Optional
 import tagflow
 from jinja2 import Environment, FileSystemLoader
 import os
@@ -19,6 +22,94 @@ from optimized_tagflow import (
 )
 
 
+# Scenario content is fixed, so build its strings once at import time
+_ROWS = tuple(
+    (str(i + 1), f"Employee {i + 1}", f"emp{i + 1}@company.com")
+    for i in range(100)
+)
+_NAV_ITEMS = tuple(
+    (f"#{item.lower()}", item) for item in ("Home", "About", "Services", "Contact")
+)
+_ARTICLES = tuple(
+    (f"Article {i + 1}", f"Content of article {i + 1}") for i in range(5)
+)
+
+
+# Fully static subtrees, pre-serialized the way FastStringBuilder renders them
+_HEAD_SIMPLE = '<head><title>Simple Page</title><meta charset="utf-8"></meta></head>'
+_HEADER_SIMPLE = "<header><h1>Welcome</h1></header>"
+_FOOTER_SIMPLE = "<footer><p>© 2024 Benchmark Test</p></footer>"
+_HEAD_COMPLEX = (
+    '<head><title>Complex Page</title><meta charset="utf-8"></meta>'
+    '<meta name="viewport" content="width=device-width, initial-scale=1"></meta>'
+    "<style>body { font-family: Arial, sans-serif; }</style></head>"
+)
+_HEAD_DATA_TABLE = "<head><title>Data Table</title></head>"
+_H1_DATA_TABLE = "<h1>Performance Data</h1>"
+_THEAD_DATA_TABLE = "<thead><tr><th>ID</th><th>Name</th><th>Email</th></tr></thead>"
+
+
+def _build_table_rows(n: int) -> str:
+    """Build the data table rows by joining a list of parts"""
+    parts = []
+    append = parts.append
+    for i in range(1, n + 1):
+        # Convert the row number once rather than once per cell
+        s = str(i)
+        append(f"<tr><td>{s}</td><td>Employee {s}</td><td>emp{s}@company.com</td></tr>")
+    return "".join(parts)
+
+
+# Numba is optional: the JIT data-table benchmark only runs when it's installed
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    _ROW_OPEN = np.frombuffer(b"<tr><td>", dtype=np.uint8)
+    _ROW_NAME = np.frombuffer(b"</td><td>Employee ", dtype=np.uint8)
+    _ROW_EMAIL = np.frombuffer(b"</td><td>emp", dtype=np.uint8)
+    _ROW_CLOSE = np.frombuffer(b"@company.com</td></tr>", dtype=np.uint8)
+    
+    @njit(cache=True)
+    def _write_bytes(buf, pos, chunk):
+        """Copy a byte chunk into the buffer, returning the new cursor"""
+        for j in range(chunk.shape[0]):
+            buf[pos + j] = chunk[j]
+        return pos + chunk.shape[0]
+    
+    @njit(cache=True)
+    def _write_int(buf, pos, value):
+        """Write the decimal digits of a positive int, returning the new cursor"""
+        width = 1
+        scale = 10
+        while value >= scale:
+            width += 1
+            scale *= 10
+        for j in range(width - 1, -1, -1):
+            buf[pos + j] = 48 + value % 10
+            value //= 10
+        return pos + width
+    
+    @njit(cache=True)
+    def _render_rows(n, row_open, row_name, row_email, row_close):
+        """Render n data-table rows into a byte buffer"""
+        fixed = row_open.shape[0] + row_name.shape[0] + row_email.shape[0] + row_close.shape[0]
+        buf = np.empty(n * (fixed + 3 * 20), dtype=np.uint8)
+        pos = 0
+        for i in range(1, n + 1):
+            pos = _write_bytes(buf, pos, row_open)
+            pos = _write_int(buf, pos, i)
+            pos = _write_bytes(buf, pos, row_name)
+            pos = _write_int(buf, pos, i)
+            pos = _write_bytes(buf, pos, row_email)
+            pos = _write_int(buf, pos, i)
+            pos = _write_bytes(buf, pos, row_close)
+        return buf[:pos]
+
+
 class BenchmarkResult:
     """Container for benchmark results"""
     
@@ -34,26 +125,75 @@ class BenchmarkResult:
 class OptimizationBenchmark:
     """Benchmark suite for testing Tagflow optimizations"""
     
-    def __init__(self, iterations: int = 1000):
+    def __init__(self, iterations: int = 7):
         self.iterations = iterations
         self.results: List[BenchmarkResult] = []
+        self.max_workers = 1
+        
+        # Build optimized instances once so timings reflect rendering only
+        self._static = create_optimized_static()
+        self._et = create_optimized_elementtree()
+        
+        # Compile each scenario as a Jinja2 template once, as the ceiling
+        # the Tagflow builders are measured against
+        self.jinja_env = Environment(auto_reload=False, optimized=True)
+        self.templates = {
+            'simple_page': self.jinja_env.from_string(
+                '<html><head><title>Simple Page</title><meta charset="utf-8"></head>'
+                '<body><header><h1>Welcome</h1></header>'
+                '<main><p>This is a simple page with basic HTML structure.</p>'
+                '<p>It includes a header, main content, and footer.</p></main>'
+                '<footer><p>© 2024 Benchmark Test</p></footer></body></html>'
+            ),
+            'complex_page': self.jinja_env.from_string(
+                '<html lang="en"><head><title>Complex Page</title><meta charset="utf-8">'
+                '<meta name="viewport" content="width=device-width, initial-scale=1">'
+                '<style>body { font-family: Arial, sans-serif; }</style></head>'
+                '<body><nav class="nav"><ul>'
+                '{% for item in ["Home", "About", "Services", "Contact"] %}'
+                '<li><a href="#{{ item.lower() }}">{{ item }}</a></li>'
+                '{% endfor %}</ul></nav>'
+                '<main><section id="content"><h2>Main Content</h2><div class="grid">'
+                '{% for i in range(5) %}'
+                '<article class="card"><h3>Article {{ i+1 }}</h3><p>Content of article {{ i+1 }}</p></article>'
+                '{% endfor %}</div></section></main></body></html>'
+            ),
+            'data_table': self.jinja_env.from_string(
+                '<html><head><title>Data Table</title></head>'
+                '<body><h1>Performance Data</h1><table><thead><tr>'
+                '{% for header in ["ID", "Name", "Email"] %}<th>{{ header }}</th>{% endfor %}'
+                '</tr></thead><tbody>'
+                '{% for i in range(100) %}'
+                '<tr><td>{{ i+1 }}</td><td>Employee {{ i+1 }}</td><td>emp{{ i+1 }}@company.com</td></tr>'
+                '{% endfor %}</tbody></table></body></html>'
+            ),
+        }
     
     def run_benchmark(self, name: str, func: Callable) -> BenchmarkResult:
-        """Run a benchmark function multiple times"""
-        print(f"  Running {name}...")
+        """
+        Time a benchmark function in batches.
         
-        times = []
+        Each of the `iterations` repeats times a batch of calls sized by
+        `timeit.Timer.autorange`, so timer overhead is amortized over the
+        batch; the recorded times are per call.
+        """
+        print(f"  Running {name}...")
         
         # Warmup
-        for _ in range(10):
-            func()
+        func()
         
-        # Actual benchmark
-        for _ in range(self.iterations):
-            start_time = time.perf_counter()
-            func()
-            end_time = time.perf_counter()
-            times.append(end_time - start_time)
+        # Actual benchmark, starting from a clean heap with the collector off
+        gc.collect()
+        gc.disable()
+        try:
+            timer = timeit.Timer(func)
+            number, _ = timer.autorange()
+            times = [
+                total / number
+                for total in timer.repeat(repeat=self.iterations, number=number)
+            ]
+        finally:
+            gc.enable()
         
         return BenchmarkResult(name, times)
     
@@ -98,9 +238,9 @@ class OptimizationBenchmark:
                 with tagflow.tag("body"):
                     with tagflow.tag("nav", **{"class": "nav"}):
                         with tagflow.tag("ul"):
-                            for item in ["Home", "About", "Services", "Contact"]:
+                            for href, item in _NAV_ITEMS:
                                 with tagflow.tag("li"):
-                                    with tagflow.tag("a", href=f"#{item.lower()}"):
+                                    with tagflow.tag("a", href=href):
                                         tagflow.text(item)
                     
                     with tagflow.tag("main"):
@@ -108,12 +248,12 @@ class OptimizationBenchmark:
                             with tagflow.tag("h2"):
                                 tagflow.text("Main Content")
                             with tagflow.tag("div", **{"class": "grid"}):
-                                for i in range(5):
+                                for title, content in _ARTICLES:
                                     with tagflow.tag("article", **{"class": "card"}):
                                         with tagflow.tag("h3"):
-                                            tagflow.text(f"Article {i+1}")
+                                            tagflow.text(title)
                                         with tagflow.tag("p"):
-                                            tagflow.text(f"Content of article {i+1}")
+                                            tagflow.text(content)
         return str(doc)
     
     def original_data_table(self):
@@ -133,20 +273,21 @@ class OptimizationBenchmark:
                                     with tagflow.tag("th"):
                                         tagflow.text(header)
                         with tagflow.tag("tbody"):
-                            for i in range(100):
+                            for id_s, name, email in _ROWS:
                                 with tagflow.tag("tr"):
                                     with tagflow.tag("td"):
-                                        tagflow.text(str(i + 1))
+                                        tagflow.text(id_s)
                                     with tagflow.tag("td"):
-                                        tagflow.text(f"Employee {i + 1}")
+                                        tagflow.text(name)
                                     with tagflow.tag("td"):
-                                        tagflow.text(f"emp{i + 1}@company.com")
+                                        tagflow.text(email)
         return str(doc)
     
     # Optimized static implementations
     def optimized_static_simple_page(self):
         """Generate simple page with optimized static Tagflow"""
-        tf = create_optimized_static()
+        tf = self._static
+        tf.reset()
         with tf.document():
             with tf.tag("html"):
                 with tf.tag("head"):
@@ -170,7 +311,8 @@ class OptimizationBenchmark:
     
     def optimized_static_complex_page(self):
         """Generate complex page with optimized static Tagflow"""
-        tf = create_optimized_static()
+        tf = self._static
+        tf.reset()
         with tf.document():
             with tf.tag("html", lang="en"):
                 with tf.tag("head"):
@@ -186,9 +328,9 @@ class OptimizationBenchmark:
                 with tf.tag("body"):
                     with tf.tag("nav", **{"class": "nav"}):
                         with tf.tag("ul"):
-                            for item in ["Home", "About", "Services", "Contact"]:
+                            for href, item in _NAV_ITEMS:
                                 with tf.tag("li"):
-                                    with tf.tag("a", href=f"#{item.lower()}"):
+                                    with tf.tag("a", href=href):
                                         tf.text(item)
                     
                     with tf.tag("main"):
@@ -196,17 +338,18 @@ class OptimizationBenchmark:
                             with tf.tag("h2"):
                                 tf.text("Main Content")
                             with tf.tag("div", **{"class": "grid"}):
-                                for i in range(5):
+                                for title, content in _ARTICLES:
                                     with tf.tag("article", **{"class": "card"}):
                                         with tf.tag("h3"):
-                                            tf.text(f"Article {i+1}")
+                                            tf.text(title)
                                         with tf.tag("p"):
-                                            tf.text(f"Content of article {i+1}")
+                                            tf.text(content)
         return str(tf)
     
     def optimized_static_data_table(self):
         """Generate data table with optimized static Tagflow"""
-        tf = create_optimized_static()
+        tf = self._static
+        tf.reset()
         with tf.document():
             with tf.tag("html"):
                 with tf.tag("head"):
@@ -222,20 +365,90 @@ class OptimizationBenchmark:
                                     with tf.tag("th"):
                                         tf.text(header)
                         with tf.tag("tbody"):
-                            for i in range(100):
+                            for id_s, name, email in _ROWS:
+                                with tf.tag("tr"):
+                                    with tf.tag("td"):
+                                        tf.text(id_s)
+                                    with tf.tag("td"):
+                                        tf.text(name)
+                                    with tf.tag("td"):
+                                        tf.text(email)
+        return str(tf)
+    
+    # Optimized static implementations with pre-built static fragments
+    def static_fragments_simple_page(self):
+        """Generate simple page, injecting its static chrome verbatim"""
+        tf = self._static
+        tf.reset()
+        with tf.document():
+            with tf.tag("html"):
+                tf.raw(_HEAD_SIMPLE)
+                with tf.tag("body"):
+                    tf.raw(_HEADER_SIMPLE)
+                    with tf.tag("main"):
+                        with tf.tag("p"):
+                            tf.text("This is a simple page with basic HTML structure.")
+                        with tf.tag("p"):
+                            tf.text("It includes a header, main content, and footer.")
+                    tf.raw(_FOOTER_SIMPLE)
+        return str(tf)
+    
+    def static_fragments_complex_page(self):
+        """Generate complex page, injecting its static head verbatim"""
+        tf = self._static
+        tf.reset()
+        with tf.document():
+            with tf.tag("html", lang="en"):
+                tf.raw(_HEAD_COMPLEX)
+                
+                with tf.tag("body"):
+                    with tf.tag("nav", **{"class": "nav"}):
+                        with tf.tag("ul"):
+                            for href, item in _NAV_ITEMS:
+                                with tf.tag("li"):
+                                    with tf.tag("a", href=href):
+                                        tf.text(item)
+                    
+                    with tf.tag("main"):
+                        with tf.tag("section", id="content"):
+                            with tf.tag("h2"):
+                                tf.text("Main Content")
+                            with tf.tag("div", **{"class": "grid"}):
+                                for title, content in _ARTICLES:
+                                    with tf.tag("article", **{"class": "card"}):
+                                        with tf.tag("h3"):
+                                            tf.text(title)
+                                        with tf.tag("p"):
+                                            tf.text(content)
+        return str(tf)
+    
+    def static_fragments_data_table(self):
+        """Generate data table, injecting its static head and header row verbatim"""
+        tf = self._static
+        tf.reset()
+        with tf.document():
+            with tf.tag("html"):
+                tf.raw(_HEAD_DATA_TABLE)
+                with tf.tag("body"):
+                    tf.raw(_H1_DATA_TABLE)
+                    with tf.tag("table"):
+                        tf.raw(_THEAD_DATA_TABLE)
+                        with tf.tag("tbody"):
+                            for id_s, name, email in _ROWS:
                                 with tf.tag("tr"):
                                     with tf.tag("td"):
-                                        tf.text(str(i + 1))
+                                        tf.text(id_s)
                                     with tf.tag("td"):
-                                        tf.text(f"Employee {i + 1}")
+                                        tf.text(name)
                                     with tf.tag("td"):
-                                        tf.text(f"emp{i + 1}@company.com")
+                                        tf.text(email)
         return str(tf)
     
     # ElementTree optimized implementations  
     def optimized_et_simple_page(self):
         """Generate simple page with optimized ElementTree Tagflow"""
-        tf = create_optimized_elementtree()
+        tf = self._et
+        tf.reset()
         with tf.document():
             with tf.tag("html"):
                 with tf.tag("head"):
@@ -259,7 +472,8 @@ class OptimizationBenchmark:
     
     def optimized_et_data_table(self):
         """Generate data table with optimized ElementTree Tagflow"""
-        tf = create_optimized_elementtree()
+        tf = self._et
+        tf.reset()
         with tf.document():
             with tf.tag("html"):
                 with tf.tag("head"):
@@ -275,48 +489,112 @@ class OptimizationBenchmark:
                                     with tf.tag("th"):
                                         tf.text(header)
                         with tf.tag("tbody"):
-                            for i in range(100):
+                            for id_s, name, email in _ROWS:
                                 with tf.tag("tr"):
                                     with tf.tag("td"):
-                                        tf.text(str(i + 1))
+                                        tf.text(id_s)
                                     with tf.tag("td"):
-                                        tf.text(f"Employee {i + 1}")
+                                        tf.text(name)
                                     with tf.tag("td"):
-                                        tf.text(f"emp{i + 1}@company.com")
+                                        tf.text(email)
         return str(tf)
     
-    def run_all_benchmarks(self):
-        """Run comprehensive benchmark suite"""
+    # Compiled Jinja2 baselines
+    def jinja_simple_page(self):
+        """Render simple page with a precompiled Jinja2 template"""
+        return self.templates['simple_page'].render()
+    
+    def jinja_complex_page(self):
+        """Render complex page with a precompiled Jinja2 template"""
+        return self.templates['complex_page'].render()
+    
+    def jinja_data_table(self):
+        """Render data table with a precompiled Jinja2 template"""
+        return self.templates['data_table'].render()
+    
+    # Plain string building
+    def fast_string_data_table(self):
+        """Generate data table by joining string parts directly"""
+        return "".join((
+            "<html><head><title>Data Table</title></head>",
+            "<body><h1>Performance Data</h1><table><thead><tr>",
+            "".join(f"<th>{header}</th>" for header in ["ID", "Name", "Email"]),
+            "</tr></thead><tbody>",
+            _build_table_rows(100),
+            "</tbody></table></body></html>",
+        ))
+    
+    # Numba JIT kernel
+    def numba_data_table(self):
+        """Generate data table with rows rendered by a Numba-compiled kernel"""
+        rows = _render_rows(100, _ROW_OPEN, _ROW_NAME, _ROW_EMAIL, _ROW_CLOSE)
+        return "".join((
+            "<html><head><title>Data Table</title></head>",
+            "<body><h1>Performance Data</h1><table><thead><tr>",
+            "<th>ID</th><th>Name</th><th>Email</th>",
+            "</tr></thead><tbody>",
+            rows.tobytes().decode(),
+            "</tbody></table></body></html>",
+        ))
+    
+    def run_all_benchmarks(self, max_workers: Optional[int] = None):
+        """Run comprehensive benchmark suite across worker processes"""
+        max_workers = max_workers or os.cpu_count() or 1
+        self.max_workers = max_workers
         print("🚀 Running Tagflow Optimization Benchmarks")
         print("=" * 60)
-        print(f"Iterations per test: {self.iterations}")
+        print(f"Timed repeats per test: {self.iterations}")
+        print(f"Worker processes: {max_workers}")
         print()
         
         benchmarks = [
             # Simple page benchmarks
             ("Original Tagflow - Simple Page", self.original_simple_page),
             ("Optimized Static - Simple Page", self.optimized_static_simple_page),
+            ("Static Fragments - Simple Page", self.static_fragments_simple_page),
             ("Optimized ElementTree - Simple Page", self.optimized_et_simple_page),
+            ("Jinja2 Compiled - Simple Page", self.jinja_simple_page),
             
             # Complex page benchmarks  
             ("Original Tagflow - Complex Page", self.original_complex_page),
             ("Optimized Static - Complex Page", self.optimized_static_complex_page),
+            ("Static Fragments - Complex Page", self.static_fragments_complex_page),
+            ("Jinja2 Compiled - Complex Page", self.jinja_complex_page),
             
             # Data table benchmarks
             ("Original Tagflow - Data Table", self.original_data_table),
             ("Optimized Static - Data Table", self.optimized_static_data_table),
+            ("Static Fragments - Data Table", self.static_fragments_data_table),
             ("Optimized ElementTree - Data Table", self.optimized_et_data_table),
+            ("Fast String - Data Table", self.fast_string_data_table),
+            ("Jinja2 Compiled - Data Table", self.jinja_data_table),
         ]
+        if njit is not None:
+            benchmarks.append(("Numba JIT - Data Table", self.numba_data_table))
+        else:
+            print("Numba not installed, skipping the Numba JIT benchmark")
         
-        for name, func in benchmarks:
-            result = self.run_benchmark(name, func)
-            self.results.append(result)
+        # Benchmarks are independent and CPU-bound, so run them in separate
+        # processes; bound methods aren't picklable, so pass method names
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_run_one, name, func.__name__, self.iterations)
+                for name, func in benchmarks
+            ]
+            for future in as_completed(futures):
+                print(f"  Finished {future.result().name}")
+        
+        # Keep submission order so scenarios print in a stable order
+        self.results.extend(future.result() for future in futures)
     
     def print_results(self):
         """Print benchmark results with comparisons"""
         print("\n" + "=" * 80)
         print("OPTIMIZATION BENCHMARK RESULTS")
         print("=" * 80)
+        if self.max_workers > 1:
+            print(f"Note: timings were collected in parallel across {self.max_workers} worker")
+            print("processes competing for cores; rerun with --workers 1 for cleaner numbers.")
         
         # Group results by scenario
         scenarios = {}
@@ -342,37 +620,47 @@ class OptimizationBenchmark:
                 print(f"  Std deviation: {result.std_time*1000:.3f} ms") 
                 print(f"  Min time: {result.min_time*1000:.3f} ms")
                 print(f"  Max time: {result.max_time*1000:.3f} ms")
+                if result.avg_time > 0 and result.std_time / result.avg_time > 0.05:
+                    print(f"  ⚠️  Unstable: std deviation is {result.std_time / result.avg_time:.1%} of the mean")
                 
                 if "Original" in impl_name:
                     original = result
             
             # Show improvements vs original
             if original:
-                print(f"\n  IMPROVEMENTS vs Original Tagflow:")
+                # Min times are the least affected by system noise, which only adds time
+                print(f"\n  IMPROVEMENTS vs Original Tagflow (by min time):")
                 for impl_name, result in implementations.items():
                     if "Original" not in impl_name:
-                        if result.avg_time > 0:
-                            speedup = original.avg_time / result.avg_time
-                            print(f"  {impl_name}: {speedup:.2f}x faster")
+                        if result.min_time > 0:
+                            speedup = original.min_time / result.min_time
+                            mean_speedup = original.avg_time / result.avg_time
+                            print(f"  {impl_name}: {speedup:.2f}x faster ({mean_speedup:.2f}x on mean)")
                         else:
                             print(f"  {impl_name}: ERROR - zero time")
         
         # Overall summary
         print(f"\n{'='*60}")
-        print("OVERALL OPTIMIZATION SUMMARY")
+        print("OVERALL OPTIMIZATION SUMMARY (min times)")
         print(f"{'='*60}")
         
         original_times = []
         static_times = []
+        fragments_times = []
         et_times = []
+        jinja_times = []
         
         for result in self.results:
             if "Original Tagflow" in result.name:
-                original_times.append(result.avg_time)
+                original_times.append(result.min_time)
             elif "Optimized Static" in result.name:
-                static_times.append(result.avg_time)
+                static_times.append(result.min_time)
+            elif "Static Fragments" in result.name:
+                fragments_times.append(result.min_time)
             elif "Optimized ElementTree" in result.name:
-                et_times.append(result.avg_time)
+                et_times.append(result.min_time)
+            elif "Jinja2 Compiled" in result.name:
+                jinja_times.append(result.min_time)
         
         if original_times and static_times:
             avg_original = statistics.mean(original_times) * 1000
@@ -384,6 +672,14 @@ class OptimizationBenchmark:
             print(f"  Static average: {avg_static:.3f} ms") 
             print(f"  Overall speedup: {static_speedup:.2f}x")
         
+        if original_times and fragments_times:
+            avg_fragments = statistics.mean(fragments_times) * 1000
+            fragments_speedup = statistics.mean(original_times) / statistics.mean(fragments_times)
+            
+            print(f"\nStatic Fragments vs Original:")
+            print(f"  Static Fragments average: {avg_fragments:.3f} ms")
+            print(f"  Overall speedup: {fragments_speedup:.2f}x")
+        
         if original_times and et_times:
             avg_et = statistics.mean(et_times) * 1000
             et_speedup = statistics.mean(original_times) / statistics.mean(et_times)
@@ -391,10 +687,29 @@ class OptimizationBenchmark:
             print(f"\nOptimized ElementTree vs Original:")
             print(f"  ElementTree average: {avg_et:.3f} ms")
             print(f"  Overall speedup: {et_speedup:.2f}x")
+        
+        if original_times and jinja_times:
+            avg_jinja = statistics.mean(jinja_times) * 1000
+            jinja_speedup = statistics.mean(original_times) / statistics.mean(jinja_times)
+            
+            print(f"\nCompiled Jinja2 vs Original:")
+            print(f"  Jinja2 average: {avg_jinja:.3f} ms")
+            print(f"  Overall speedup: {jinja_speedup:.2f}x")
+
+
+def _run_one(name: str, method_name: str, iterations: int) -> BenchmarkResult:
+    """Run a single benchmark in a worker process"""
+    benchmark = OptimizationBenchmark(iterations=iterations)
+    return benchmark.run_benchmark(name, getattr(benchmark, method_name))
 
 
 def main():
     """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', default=None, type=int,
+                        help='number of benchmark worker processes (default: CPU count)')
+    args = parser.parse_args()
+    
     print("Testing optimized implementations first...")
     
     # Quick validation that optimizations work
@@ -411,17 +726,44 @@ def main():
                 with et.tag("body"):
                     et.text("Test")
         
+        # Reused instances must render the same output as fresh ones; every
+        # render below runs on the instance shared by the previous ones
+        check = OptimizationBenchmark()
+        shared = (check._static, check._et)
+        for render, attr, create in (
+            (check.optimized_static_simple_page, "_static", create_optimized_static),
+            (check.optimized_static_complex_page, "_static", create_optimized_static),
+            (check.optimized_static_data_table, "_static", create_optimized_static),
+            (check.optimized_et_simple_page, "_et", create_optimized_elementtree),
+            (check.optimized_et_data_table, "_et", create_optimized_elementtree),
+        ):
+            reused_html = render()
+            setattr(check, attr, create())
+            fresh_html = render()
+            check._static, check._et = shared
+            if reused_html != fresh_html:
+                raise AssertionError(f"{render.__name__} output changes on reuse")
+        
+        # Pre-built fragments must serialize exactly like the tag-by-tag path
+        for fragments, reference in (
+            (check.static_fragments_simple_page, check.optimized_static_simple_page),
+            (check.static_fragments_complex_page, check.optimized_static_complex_page),
+            (check.static_fragments_data_table, check.optimized_static_data_table),
+        ):
+            if fragments() != reference():
+                raise AssertionError(f"{fragments.__name__} differs from {reference.__name__}")
+        
         print("✅ All optimized implementations working correctly!")
         print()
     except Exception as e:
         print(f"❌ Error in optimized implementations: {e}")
         return
     
-    # Run benchmarks with fewer iterations for development
-    iterations = 100  # Increase for production benchmarks
+    # Each repeat times an autoranged batch of calls
+    iterations = 7  # Increase for production benchmarks
     
     benchmark = OptimizationBenchmark(iterations=iterations)
-    benchmark.run_all_benchmarks()
+    benchmark.run_all_benchmarks(max_workers=args.workers)
     benchmark.print_results()
     
     print(f"\n{'='*80}")
@@ -27,6 +27,11 @@ def cached_attr_name_to_xml(name: str) -> str:
     return _attr_name_cache[name]
 
 
+# Pre-built tag fragments, keyed by tag name
+_open_tag_cache: Dict[str, str] = {}
+_close_tag_cache: Dict[str, str] = {}
+
+
 class FastStringBuilder:
     """
     Fast HTML string builder that avoids ElementTree overhead.
@@ -47,14 +52,23 @@ class FastStringBuilder:
         if self_closing:
             self.parts.append(f"<{tag_name}{attr_str} />")
         else:
-            self.parts.append(f"<{tag_name}{attr_str}>")
-            self.tag_stack.append(tag_name)
+            if attrs:
+                self.parts.append(f"<{tag_name}{attr_str}>")
+            else:
+                opening = _open_tag_cache.get(tag_name)
+                if opening is None:
+                    opening = _open_tag_cache[tag_name] = f"<{tag_name}>"
+                self.parts.append(opening)
+            # Stack the closing fragment itself so closing is a plain pop
+            closing = _close_tag_cache.get(tag_name)
+            if closing is None:
+                closing = _close_tag_cache[tag_name] = f"</{tag_name}>"
+            self.tag_stack.append(closing)
     
     def close_tag(self):
         """Close the most recent tag"""
         if self.tag_stack:
-            tag_name = self.tag_stack.pop()
-            self.parts.append(f"</{tag_name}>")
+            self.parts.append(self.tag_stack.pop())
     
     def add_text(self, text: str):
         """Add text content"""
@@ -62,9 +76,18 @@ class FastStringBuilder:
         escaped = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
         self.parts.append(escaped)
     
+    def add_raw(self, html: str):
+        """Add pre-built HTML verbatim, without escaping"""
+        self.parts.append(html)
+    
     def to_string(self) -> str:
         """Get the final HTML string"""
         return "".join(self.parts)
+    
+    def reset(self):
+        """Clear the buffers so the builder can be reused"""
+        self.parts.clear()
+        self.tag_stack.clear()
 
 
 class OptimizedStaticTagflow:
@@ -119,6 +142,15 @@ class OptimizedStaticTagflow:
         builder = self._current_builder.get()
         builder.add_text(content)
     
+    def raw(self, html: str):
+        """Add a pre-built static HTML fragment"""
+        builder = self._current_builder.get()
+        builder.add_raw(html)
+    
+    def reset(self):
+        """Discard generated content so the instance can be reused"""
+        self.builder.reset()
+    
     def to_html(self) -> str:
         """Get the final HTML"""
         return self.builder.to_string()
@@ -179,6 +211,10 @@ class OptimizedElementTreeTagflow:
         finally:
             self._current_element.reset(token)
     
+    def reset(self):
+        """Discard generated content so the instance can be reused"""
+        self.element.clear()
+    
     def text(self, content: str):
         """Add text content"""
         current_el = self._current_element.get()